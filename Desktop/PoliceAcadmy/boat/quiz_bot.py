@@ -9,7 +9,6 @@ import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List
-import requests
 
 from telegram import Update
 from telegram.ext import (
@@ -25,56 +24,76 @@ DELAY_BETWEEN_BATCHES = 10
 AUTO_UPLOAD = True
 # -----------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class QuizItem:
     question_no: str
     question: str
     options: List[str]
     correct_option_id: int
     description: str | None = None
+    # Ready-to-send poll text, truncated to Telegram's limits once at load time
+    poll_question: str = ""
+    explanation: str = ""
 
 class QuestionBank:
     def __init__(self) -> None:
         self.items: List[QuizItem] = []
 
     def load_csv(self, path: Path) -> int:
-        with path.open(encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+        with path.open(encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            col = {name: i for i, name in enumerate(header)}
             required = {
                 "question_no", "question", "option1", "option2",
                 "option3", "option4", "correct_answer", "description"
             }
-            if not required.issubset(set(reader.fieldnames or [])):
-                raise ValueError(f"CSV missing columns. Required: {required}. Found: {reader.fieldnames}")
+            if not required <= col.keys():
+                raise ValueError(f"CSV missing columns. Required: {required}. Found: {header}")
+
+            # Resolve column positions once; rows are then plain list indexing
+            qn_i, q_i, o1_i, o2_i, o3_i, o4_i, ans_i, desc_i = (
+                col["question_no"], col["question"],
+                col["option1"], col["option2"], col["option3"], col["option4"],
+                col["correct_answer"], col["description"],
+            )
+            width = len(header)
 
             for row in reader:
-                if not row.get("question"):
+                if not row:
+                    continue
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                if not row[q_i]:
                     continue
-                options = [
-                    row.get("option1", ""), row.get("option2", ""),
-                    row.get("option3", ""), row.get("option4", "")
-                ]
-                options = [opt.strip() for opt in options if opt.strip()]
-                try:
-                    cid = int(row.get("correct_answer", 1)) - 1
-                except Exception:
+                options = [opt.strip() for opt in (row[o1_i], row[o2_i], row[o3_i], row[o4_i])]
+                options = [opt for opt in options if opt]
+                # isdecimal() is exactly the digit set int() accepts (isdigit() also lets
+                # through superscripts like "²", which int() rejects); int() also takes a sign
+                correct_raw = row[ans_i].strip().removeprefix("+")
+                if not correct_raw.isdecimal():
                     continue
+                cid = int(correct_raw) - 1
                 if not (0 <= cid < len(options)):
                     continue
 
+                question_no = row[qn_i]
+                question = row[q_i].strip()
+                description = row[desc_i] or None
                 self.items.append(
                     QuizItem(
-                        row.get("question_no", ""),
-                        row["question"].strip(),
-                        options,
+                        question_no,
+                        question,
+                        options,  # At most 4 columns, within Telegram's 10-option limit
                         cid,
-                        row.get("description") or None
+                        description,
+                        f"{question_no}. {question}"[:300],
+                        (description or "")[:200]
                     )
                 )
         return len(self.items)
 
-QBANK = QuestionBank()
-QBANK.load_csv(CSV_PATH)
+QBANK = QuestionBank()  # Filled by main() before any handler runs
 
 HELP_TEXT = (
     "नमस्कार! मी Bulk Quiz Bot आहे.\n\n"
@@ -105,16 +124,16 @@ async def upload_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
             try:
                 await context.bot.send_poll(
                     chat_id=chat_id,
-                    question=f"{item.question_no}. {item.question}"[:300],
-                    options=item.options[:10],
+                    question=item.poll_question,
+                    options=item.options,
                     type="quiz",
                     correct_option_id=item.correct_option_id,
-                    explanation=(item.description or "")[:200],
+                    explanation=item.explanation,
                     is_anonymous=False,
                 )
                 await asyncio.sleep(DELAY_BETWEEN_POLLS)
             except Exception as e:
-                logging.error(f"Failed to send question {start_idx+idx}: {e}")
+                logging.error("Failed to send question %d: %s", start_idx + idx, e)
 
         await update.message.reply_text("✅ Batch sent. Waiting before next batch...")
         await asyncio.sleep(DELAY_BETWEEN_BATCHES)
@@ -123,36 +142,38 @@ async def upload_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 
 async def auto_upload_on_start(app: Application) -> None:
     """Automatically send /uploadall to the most recent chat when the bot starts."""
-    await asyncio.sleep(5)
     updates = await app.bot.get_updates()
     if updates and updates[-1].message:
         fake_update = Update(update_id=updates[-1].update_id, message=updates[-1].message)
         await upload_all(fake_update, ContextTypes.DEFAULT_TYPE)
 
 async def main() -> None:
-    # Remove webhook to avoid conflicts
-    requests.get(f"https://api.telegram.org/bot{BOT_TOKEN}/deleteWebhook")
-
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
-    # FIX: Pass post_init during ApplicationBuilder construction
-    builder = ApplicationBuilder().token(BOT_TOKEN)
-    if AUTO_UPLOAD:
-        builder = builder.post_init(auto_upload_on_start)
+    # Parse the CSV in a worker thread while the bot connects
+    load_task = asyncio.create_task(asyncio.to_thread(QBANK.load_csv, CSV_PATH))
 
-    application = builder.build()
+    application = ApplicationBuilder().token(BOT_TOKEN).build()
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("count", count))
     application.add_handler(CommandHandler("uploadall", upload_all))
 
-    await application.run_polling()
+    # Drive the application lifecycle directly: run_polling() starts its own event
+    # loop and cannot be awaited from inside asyncio.run() without nest_asyncio.
+    async with application:
+        # Remove webhook to avoid conflicts (pending updates are kept for AUTO_UPLOAD)
+        await asyncio.gather(load_task, application.bot.delete_webhook())
+        if AUTO_UPLOAD:
+            await auto_upload_on_start(application)
+
+        await application.updater.start_polling()
+        await application.start()
+        try:
+            await asyncio.Event().wait()  # Serve until the process is stopped
+        finally:
+            await application.updater.stop()
+            await application.stop()
 
 if __name__ == "__main__":
-    try:
-        import nest_asyncio
-        nest_asyncio.apply()
-    except ImportError:
-        pass
-
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Build the question bank cache ahead of time, so the next bot start skips parsing the CSV
+
+Run it after editing the CSV on a host that keeps its checkout between runs. The cache
+(*.csv.pkl) is gitignored, so fresh checkouts such as the CI workflow parse on first start.
+
+Usage: python -m boat.build_bank [path/to/quiz.csv ...]
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+if __package__:
+    from boat.questionbank import CSV_PATH, QuestionBank, cache_path_for
+else:  # Run as a script (python boat/build_bank.py): boat/ itself is on sys.path
+    from questionbank import CSV_PATH, QuestionBank, cache_path_for
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    paths = [Path(arg) for arg in sys.argv[1:]] or [CSV_PATH]
+    for path in paths:
+        question_nos = QuestionBank.build_cache(path)[0]
+        logging.info("Cached %d questions from %s to %s", len(question_nos), path, cache_path_for(path))
+
+if __name__ == "__main__":
+    main()
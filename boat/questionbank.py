@@ -0,0 +1,206 @@
+"""
+Question bank — load quiz questions from CSV, shared by the bot entry points
+"""
+
+import csv
+import functools
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+CSV_PATH = Path("data/quiz.csv")  # Default question bank, relative to the repo root
+
+CACHE_FORMAT = 5  # Bump whenever QuizItem or the column layout changes so stale caches are rebuilt
+
+REQUIRED_COLUMNS = frozenset({
+    "question_no", "question", "option1", "option2",
+    "option3", "option4", "correct_answer", "description", "reference"
+})
+
+def cache_path_for(path: Path) -> Path:
+    """Where the parsed copy of the CSV at `path` is pickled."""
+    return path.with_name(path.name + ".pkl")
+
+class QuizItem(NamedTuple):
+    """One question, as a read-only view over a row of QuestionBank's columns."""
+    question_no: str
+    question: str
+    options: List[str]
+    correct_option_id: int
+    description: Optional[str] = None
+    reference: Optional[str] = None
+    # Ready-to-send poll text, built once at load time
+    poll_question: str = ""
+    explanation: str = ""
+
+# One sequence per QuizItem field, in QuizItem._fields order
+Columns = Tuple[List[str], List[str], List[List[str]], array, List[Optional[str]],
+                List[Optional[str]], List[str], List[str]]
+
+def _empty_columns() -> Columns:
+    # correct_option_id fits in a signed byte: Telegram allows at most 10 options
+    return [], [], [], array("b"), [], [], [], []
+
+class QuestionBank:
+    """Questions stored column-wise, one sequence per QuizItem field.
+
+    Scans that need a single field (counting, searching) touch only that column;
+    indexing or iterating the bank yields QuizItem views for code that wants rows.
+    """
+
+    def __init__(self) -> None:
+        (self.question_nos, self.questions, self.options, self.correct_option_ids,
+         self.descriptions, self.references, self.poll_questions, self.explanations) = _empty_columns()
+        # send_poll keyword arguments per question, derived from the columns above;
+        # built once at load time and reused for every send and retry
+        self.poll_kwargs: List[Dict[str, Any]] = []
+
+    @property
+    def columns(self) -> Columns:
+        return (self.question_nos, self.questions, self.options, self.correct_option_ids,
+                self.descriptions, self.references, self.poll_questions, self.explanations)
+
+    def __len__(self) -> int:
+        return len(self.question_nos)
+
+    def __getitem__(self, index: int) -> QuizItem:
+        return QuizItem._make(column[index] for column in self.columns)
+
+    def __iter__(self) -> Iterator[QuizItem]:
+        return map(QuizItem._make, zip(*self.columns))
+
+    def load_csv(self, path: Path) -> int:
+        if not path.exists():
+            raise FileNotFoundError(f"CSV file not found: {path}")
+
+        columns = self._load_cache(path, cache_path_for(path))
+        if columns is None:
+            columns = self.build_cache(path)
+        for column, values in zip(self.columns, columns):
+            column.extend(values)
+        _, _, options, correct_option_ids, _, _, poll_questions, explanations = columns
+        self.poll_kwargs.extend(
+            {"question": question, "options": opts, "type": "quiz",
+             "correct_option_id": cid, "explanation": explanation, "is_anonymous": True}
+            for question, opts, cid, explanation
+            in zip(poll_questions, options, correct_option_ids, explanations)
+        )
+        return len(self)
+
+    @classmethod
+    def build_cache(cls, path: Path) -> Columns:
+        """Parse `path` and (re)write its pickle cache, whatever its current state."""
+        columns = cls._parse_csv(path)
+        cls._write_cache(cache_path_for(path), columns)
+        return columns
+
+    @staticmethod
+    def _load_cache(path: Path, cache_path: Path) -> Optional[Columns]:
+        """Return the pickled columns if the cache is at least as new as the CSV."""
+        try:
+            if cache_path.stat().st_mtime < path.stat().st_mtime:
+                return None
+            with cache_path.open("rb") as f:
+                version, columns = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+            return None
+        return columns if version == CACHE_FORMAT else None
+
+    @staticmethod
+    def _write_cache(cache_path: Path, columns: Columns) -> None:
+        """Atomically write the parsed columns next to the CSV."""
+        try:
+            fd, tmp = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump((CACHE_FORMAT, columns), f, protocol=5)
+                os.replace(tmp, cache_path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            logging.warning("Could not write cache %s: %s", cache_path, e)
+
+    @staticmethod
+    def _parse_csv(path: Path) -> Columns:
+        columns = _empty_columns()
+        # newline="" as the csv module requires: it handles line endings itself
+        with path.open(encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            col = {name: i for i, name in enumerate(header)}
+            if not REQUIRED_COLUMNS <= col.keys():
+                raise ValueError(f"CSV missing columns. Required: {set(REQUIRED_COLUMNS)}. Found: {header}")
+
+            qn_i, q_i, o1_i, o2_i, o3_i, o4_i, ans_i, desc_i, ref_i = (
+                col["question_no"], col["question"],
+                col["option1"], col["option2"], col["option3"], col["option4"],
+                col["correct_answer"], col["description"], col["reference"],
+            )
+            width = len(header)
+            strip = str.strip
+            # Options and exam references repeat across rows; keep one string object each
+            intern = sys.intern
+            (add_qn, add_q, add_opts, add_cid,
+             add_desc, add_ref, add_poll, add_expl) = (column.append for column in columns)
+
+            for row in reader:
+                if not row:
+                    continue  # DictReader skipped blank lines too
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+
+                # Even if question is empty, add a placeholder
+                question_text = strip(row[q_i])
+                if not question_text:
+                    question_text = "[MISSING QUESTION]"
+
+                # Keep all 4 options (even if blank). Four CSV columns can never exceed
+                # Telegram's 10-option limit, so the list is stored without a [:10] copy.
+                options = [intern(strip(opt)) for opt in (row[o1_i], row[o2_i], row[o3_i], row[o4_i])]
+                if not any(options):
+                    options = ["[No Options Provided]"]
+
+                correct_raw = strip(row[ans_i])
+                cid = 0  # Default to first option if mismatch
+
+                # isdecimal(), not isdigit(): int() rejects digits like "²" that isdigit() accepts
+                if correct_raw.isdecimal():
+                    pos = int(correct_raw) - 1
+                    if 0 <= pos < len(options):
+                        cid = pos
+                elif correct_raw in options:
+                    cid = options.index(correct_raw)
+
+                question_no = intern(row[qn_i])
+                description = row[desc_i] or None
+                reference = intern(row[ref_i]) or None
+                poll_question = f"{question_no}) {question_text}"
+                if reference:
+                    poll_question += f"\n{reference}"
+
+                add_qn(question_no)
+                add_q(question_text)
+                add_opts(options)
+                add_cid(cid)
+                add_desc(description)
+                add_ref(reference)
+                add_poll(poll_question[:300])
+                add_expl((description or "")[:200])
+        return columns
+
+@functools.lru_cache(maxsize=1)
+def get_qbank(path: Path) -> QuestionBank:
+    """Parse `path` once per process and hand every caller the same QuestionBank."""
+    qbank = QuestionBank()
+    loaded_count = qbank.load_csv(path)
+    logging.info("Loaded %d questions from CSV", loaded_count)
+    return qbank
@@ -4,99 +4,55 @@ Telegram Quiz Bot — Bulk Upload All Questions from CSV to Group/Channel
 """
 
 import asyncio
-import csv
+import heapq
 import logging
-from dataclasses import dataclass
-from pathlib import Path
-from typing import List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Union
 import os
 
 from telegram import Update
+from telegram.constants import ChatType
+from telegram.error import BadRequest, Forbidden, RetryAfter
 from telegram.ext import (
     Application, ApplicationBuilder, CommandHandler, ContextTypes
 )
+from telegram.request import HTTPXRequest, RequestData
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to PTB's stdlib json encoding
+    orjson = None
+
+if __package__:
+    from boat.questionbank import CSV_PATH, get_qbank
+else:  # Run as a script (python boat/quiz_bot.py): boat/ itself is on sys.path
+    from questionbank import CSV_PATH, get_qbank
+
+# (question_no, send_poll keyword arguments)
+Poll = Tuple[str, Dict[str, Any]]
+# (position in the CSV, poll, failed attempts so far)
+Entry = Tuple[int, Poll, int]
 
 # ---------------- CONFIG ----------------
-CSV_PATH = Path("data/quiz.csv")
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 CHANNEL_ID = os.environ.get("TELEGRAM_CHANNELID")
-BATCH_SIZE = 100
-DELAY_BETWEEN_POLLS = 2
-DELAY_BETWEEN_BATCHES = 10
-MAX_RETRIES = 3  # Retry sending polls to avoid skipping
+POLL_CONCURRENCY = 8  # Max send_poll requests in flight at once
+POLLS_PER_MINUTE = 20  # Telegram's per-group/channel message limit
+PRIVATE_POLLS_PER_MINUTE = 60  # Telegram's ~1 message/second limit for a private chat
+BOT_POLLS_PER_SECOND = 30  # Telegram's overall per-bot limit, shared by all uploads
+MAX_RETRIES = 5  # Attempts per poll before giving up on it
+PROGRESS_EVERY = 50  # Log upload progress after this many polls
+# PTB's ApplicationBuilder would default to a 256-connection HTTP/1.1 pool; over HTTP/2
+# requests multiplex, so 16 leaves room for POLL_CONCURRENCY sends and handler replies.
+CONNECTION_POOL_SIZE = 16
+POOL_TIMEOUT = 10  # Seconds a request may wait for a free pooled connection
 # -----------------------------------------
 
-if not BOT_TOKEN:
-    raise RuntimeError("TELEGRAM_BOT_TOKEN is missing! Set it in GitHub Secrets.")
-
-if not CHANNEL_ID:
-    raise RuntimeError("TELEGRAM_CHANNELID is missing! Set it in GitHub Secrets.")
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
-logging.info(f"Loaded CHANNEL_ID: {CHANNEL_ID}")
-
-@dataclass
-class QuizItem:
-    question_no: str
-    question: str
-    options: List[str]
-    correct_option_id: int
-    description: Optional[str] = None
-    reference: Optional[str] = None
-
-class QuestionBank:
-    def __init__(self) -> None:
-        self.items: List[QuizItem] = []
-
-    def load_csv(self, path: Path) -> int:
-        if not path.exists():
-            raise FileNotFoundError(f"CSV file not found: {path}")
-
-        with path.open(encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            required = {
-                "question_no", "question", "option1", "option2",
-                "option3", "option4", "correct_answer", "description", "reference"
-            }
-            if not required.issubset(set(reader.fieldnames or [])):
-                raise ValueError(f"CSV missing columns. Required: {required}. Found: {reader.fieldnames}")
-
-            for row in reader:
-                # Even if question is empty, add a placeholder
-                question_text = (row.get("question") or "").strip()
-                if not question_text:
-                    question_text = "[MISSING QUESTION]"
-
-                # Keep all 4 options (even if blank)
-                options = [(row.get(f"option{i}") or "").strip() for i in range(1, 5)]
-                if not any(options):
-                    options = ["[No Options Provided]"]
-
-                correct_raw = (row.get("correct_answer") or "").strip()
-                cid = 0  # Default to first option if mismatch
-
-                if correct_raw.isdigit():
-                    idx = int(correct_raw) - 1
-                    if 0 <= idx < len(options):
-                        cid = idx
-                elif correct_raw in options:
-                    cid = options.index(correct_raw)
-
-                self.items.append(
-                    QuizItem(
-                        question_no=row.get("question_no", ""),
-                        question=question_text,
-                        options=options,
-                        correct_option_id=cid,
-                        description=row.get("description") or None,
-                        reference=row.get("reference") or None
-                    )
-                )
-        return len(self.items)
-
-QBANK = QuestionBank()
-loaded_count = QBANK.load_csv(CSV_PATH)
-logging.info(f"Loaded {loaded_count} questions from CSV")
+# The format above never shows thread or process info; skip collecting it per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 HELP_TEXT = (
     "नमस्कार! मी Bulk Quiz Bot आहे.\n\n"
@@ -110,78 +66,218 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text(f"👋 Hi {update.effective_user.first_name or ''}!\n" + HELP_TEXT)
 
 async def count(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    await update.message.reply_text(f"📚 Total questions loaded: {len(QBANK.items)}")
-
-async def send_quiz_batch(context: ContextTypes.DEFAULT_TYPE, chat_id: str, to_channel: bool = False):
-    """Send quiz batch to chat or channel without skipping any question."""
-    for start_idx in range(0, len(QBANK.items), BATCH_SIZE):
-        batch = QBANK.items[start_idx:start_idx + BATCH_SIZE]
-
-        for idx, item in enumerate(batch, 1):
-            poll_question = f"{item.question_no}) {item.question}"
-            if item.reference:
-                poll_question += f"\n{item.reference}"
-
-            sent = False
-            for attempt in range(MAX_RETRIES):
-                try:
-                    await context.bot.send_poll(
-                        chat_id=chat_id,
-                        question=poll_question[:300],
-                        options=item.options[:10],
-                        type="quiz",
-                        correct_option_id=item.correct_option_id,
-                        explanation=(item.description or "")[:200],
-                        is_anonymous=True
-                    )
-                    sent = True
-                    break
-                except Exception as e:
-                    logging.warning(f"Retry {attempt+1}/{MAX_RETRIES} for Q{item.question_no}: {e}")
-                    await asyncio.sleep(5)
-
-            if not sent:
-                logging.error(f"❌ Failed to send Q{item.question_no} after {MAX_RETRIES} retries.")
-
-            await asyncio.sleep(DELAY_BETWEEN_POLLS)
-
-        await asyncio.sleep(DELAY_BETWEEN_BATCHES)
+    await update.message.reply_text(f"📚 Total questions loaded: {len(get_qbank(CSV_PATH))}")
+
+class RateLimiter:
+    """Let at most `rate` callers through per `period` seconds, evenly spaced.
+
+    Waiters are released in FIFO order, so polls still start in CSV order.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0) -> None:
+        self.interval = period / rate
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            # Re-check after sleeping: pause() may have pushed the slot back
+            while (delay := self._next_slot - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            self._next_slot = loop.time() + self.interval
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. after a flood-control error."""
+        resume_at = asyncio.get_running_loop().time() + seconds
+        self._next_slot = max(self._next_slot, resume_at)
+
+BOT_RATE = RateLimiter(BOT_POLLS_PER_SECOND)
+
+class _OrjsonRequestData(RequestData):
+    """RequestData that JSON-encodes non-string parameters with orjson."""
+
+    __slots__ = ()
+
+    @property
+    def json_parameters(self) -> Dict[str, str]:
+        # Same contract as RequestData.json_parameters: strings pass through untouched
+        return {
+            name: value if isinstance(value, str) else orjson.dumps(value).decode()
+            for name, value in self.parameters.items()
+        }
+
+class OrjsonRequest(HTTPXRequest):
+    """HTTPXRequest that serializes request parameters with orjson."""
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None, **kwargs):
+        if request_data is not None:
+            request_data = _OrjsonRequestData(request_data._parameters)
+        return await super().do_request(url, method, request_data, **kwargs)
+
+async def send_quiz_batch(context: ContextTypes.DEFAULT_TYPE, chat_id: Union[int, str], to_channel: bool = False) -> int:
+    """Send every question to a chat or channel and return how many polls went out.
+
+    Flood control never drops a poll, but one Telegram rejects (BadRequest/Forbidden)
+    is skipped, as is one still failing on network errors after MAX_RETRIES attempts.
+    `to_channel` selects the group/channel rate limit instead of the private chat one.
+    """
+    rate = RateLimiter(POLLS_PER_MINUTE if to_channel else PRIVATE_POLLS_PER_MINUTE, 60)
+    send_poll = context.bot.send_poll
+    # String parameters go out as-is, anything else is JSON-encoded per request;
+    # convert once so numeric chat ids skip that on every poll.
+    chat_id = str(chat_id)
+
+    # The bank prebuilds each question's send_poll arguments, so neither the first
+    # send nor any retry assembles them again.
+    qbank = get_qbank(CSV_PATH)
+    polls = zip(qbank.question_nos, qbank.poll_kwargs)
+    pending: Deque[Entry] = deque((seq, poll, 0) for seq, poll in enumerate(polls))
+    total = len(pending)
+    # Polls bounced by flood control, resent in CSV order ahead of `pending`. Until all
+    # of them are through, sends go out one at a time so nothing overtakes them.
+    throttled: List[Entry] = []
+    flooded: Set[int] = set()
+    # Keep at most POLL_CONCURRENCY sends in flight; handle each as soon as it
+    # finishes instead of waiting on the slowest one.
+    inflight: Dict[asyncio.Task, Entry] = {}
+    sent = 0
+
+    def _finish(task: asyncio.Task) -> bool:
+        """Account for a finished send; return True if it paused the rate limiter."""
+        nonlocal sent
+        entry = inflight.pop(task)
+        seq, (question_no, _), failures = entry
+        e = task.exception()
+        if isinstance(e, RetryAfter):
+            # Flood control is not this question's fault: requeue it in CSV order ahead
+            # of everything else without using up an attempt, and pause the limiter so
+            # every other send waits too.
+            logging.warning("Flood control on Q%s, pausing for %ss", question_no, e.retry_after)
+            rate.pause(e.retry_after + 0.1)
+            heapq.heappush(throttled, entry)
+            flooded.add(seq)
+            return True
+        flooded.discard(seq)
+        if e is None:
+            sent += 1
+            if sent % PROGRESS_EVERY == 0:
+                logging.info("📤 Sent %d/%d polls to %s", sent, total, chat_id)
+            return False
+        if isinstance(e, (BadRequest, Forbidden)):
+            # Telegram rejected the poll itself; resending the same payload cannot help
+            logging.error("❌ Telegram rejected Q%s: %s", question_no, e)
+            return False
+        if failures + 1 < MAX_RETRIES:
+            # Timeouts and other network errors: back off exponentially, capped at 30 s
+            logging.warning("Retry %d/%d for Q%s: %s", failures + 1, MAX_RETRIES, question_no, e)
+            rate.pause(min(2 ** (failures + 1), 30))
+            pending.append((seq, entry[1], failures + 1))
+            return True
+        logging.error("❌ Failed to send Q%s after %d retries.", question_no, MAX_RETRIES)
+        return False
+
+    try:
+        while pending or throttled or inflight:
+            limit = 1 if flooded else POLL_CONCURRENCY
+            dispatch = bool(pending or throttled) and len(inflight) < limit
+            if dispatch:
+                # Take a send slot before choosing the poll, so queue order is the
+                # order polls actually go out in.
+                await rate.acquire()
+                await BOT_RATE.acquire()
+                done = [task for task in inflight if task.done()]
+            else:
+                done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+
+            paused = False
+            for task in done:
+                paused |= _finish(task)
+            # A pause that landed while we waited for the slot makes that slot stale:
+            # go round again so the next send waits it out.
+            if dispatch and not paused:
+                entry = heapq.heappop(throttled) if throttled else pending.popleft()
+                poll = entry[1]
+                inflight[asyncio.create_task(send_poll(chat_id=chat_id, **poll[1]))] = entry
+    finally:
+        for task in inflight:
+            task.cancel()
+
+    logging.info("📤 Sent %d/%d polls to %s", sent, total, chat_id)
+    return sent
 
 async def upload_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if not QBANK.items:
+    qbank = get_qbank(CSV_PATH)
+    if not qbank:
         await update.message.reply_text("❌ No questions found in CSV.")
         return
-    await update.message.reply_text(f"🚀 Uploading {len(QBANK.items)} questions to this chat...")
-    await send_quiz_batch(context, update.effective_chat.id, to_channel=False)
-    await update.message.reply_text("🎉 All questions uploaded successfully!")
+    await update.message.reply_text(f"🚀 Uploading {len(qbank)} questions to this chat...")
+    # Groups share the channel limit; only private chats get the faster pace
+    is_group = update.effective_chat.type != ChatType.PRIVATE
+    sent = await send_quiz_batch(context, update.effective_chat.id, to_channel=is_group)
+    if sent == len(qbank):
+        await update.message.reply_text("🎉 All questions uploaded successfully!")
+    else:
+        await update.message.reply_text(f"⚠️ Uploaded {sent}/{len(qbank)} questions; see the log for the rest.")
 
 async def upload_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if not QBANK.items:
+    qbank = get_qbank(CSV_PATH)
+    if not qbank:
         await update.message.reply_text("❌ No questions found in CSV.")
         return
-    await update.message.reply_text(f"📢 Uploading {len(QBANK.items)} questions to channel {CHANNEL_ID}...")
+    await update.message.reply_text(f"📢 Uploading {len(qbank)} questions to channel {CHANNEL_ID}...")
     try:
-        await send_quiz_batch(context, CHANNEL_ID, to_channel=True)
-        await update.message.reply_text("✅ All questions uploaded to channel!")
+        sent = await send_quiz_batch(context, CHANNEL_ID, to_channel=True)
+        if sent == len(qbank):
+            await update.message.reply_text("✅ All questions uploaded to channel!")
+        else:
+            await update.message.reply_text(f"⚠️ Uploaded {sent}/{len(qbank)} questions to channel; see the log for the rest.")
     except Exception as e:
-        logging.error(f"Upload to channel failed: {e}")
+        logging.error("Upload to channel failed: %s", e)
         await update.message.reply_text(f"❌ Failed to upload to channel: {e}")
 
 async def main() -> None:
-    application = ApplicationBuilder().token(BOT_TOKEN).build()
-    await application.bot.delete_webhook(drop_pending_updates=True)
+    if not BOT_TOKEN:
+        raise RuntimeError("TELEGRAM_BOT_TOKEN is missing! Set it in GitHub Secrets.")
+
+    if not CHANNEL_ID:
+        raise RuntimeError("TELEGRAM_CHANNELID is missing! Set it in GitHub Secrets.")
+
+    logging.info("Loaded CHANNEL_ID: %s", CHANNEL_ID)
+    # Parse (or load the cached bank) in a worker thread while the bot connects
+    load_task = asyncio.create_task(asyncio.to_thread(get_qbank, CSV_PATH))
+
+    # HTTP/2 lets concurrent send_poll calls share one multiplexed connection
+    request_cls = OrjsonRequest if orjson is not None else HTTPXRequest
+    request = request_cls(
+        http_version="2", connection_pool_size=CONNECTION_POOL_SIZE, pool_timeout=POOL_TIMEOUT
+    )
+    # getUpdates keeps PTB's own single-connection HTTP/1.1 client: a cancelled or timed-out
+    # long poll on a shared HTTP/2 connection can break the in-flight sends (PTB #3556).
+    application = ApplicationBuilder().token(BOT_TOKEN).request(request).build()
+    application.bot_data["http"] = request  # For any auxiliary HTTP calls from handlers
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("count", count))
     application.add_handler(CommandHandler("uploadall", upload_all))
     application.add_handler(CommandHandler("uploadchannel", upload_channel))
 
-    await application.run_polling(drop_pending_updates=True)
+    # Drive the application lifecycle directly: run_polling() starts its own event
+    # loop and cannot be awaited from inside asyncio.run() without nest_asyncio.
+    async with application:
+        await asyncio.gather(load_task, application.bot.delete_webhook(drop_pending_updates=True))
+        await application.updater.start_polling(drop_pending_updates=True)
+        await application.start()
+        try:
+            await asyncio.Event().wait()  # Serve until the process is stopped
+        finally:
+            await application.updater.stop()
+            await application.stop()
 
 if __name__ == "__main__":
     try:
-        import nest_asyncio
-        nest_asyncio.apply()
+        import uvloop  # Faster libuv-based event loop where available (not on Windows)
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     except ImportError:
         pass
     asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+send_quiz_batch retry and pacing, driven by a fake bot instead of Telegram
+"""
+
+import asyncio
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+from boat import quiz_bot
+from boat.questionbank import get_qbank
+
+QUESTIONS = 10
+IN_ORDER = [str(n) for n in range(1, QUESTIONS + 1)]
+
+class FakeBot:
+    """Record every send_poll attempt and raise the scripted errors, once each."""
+
+    def __init__(self, errors):
+        self.errors = errors  # question_no -> list of exceptions to raise in turn
+        self.attempts = []
+
+    async def send_poll(self, chat_id, question, **kwargs):
+        question_no = question.split(")", 1)[0]
+        self.attempts.append(question_no)
+        await asyncio.sleep(0.001)  # A round trip well inside one send slot
+        if self.errors.get(question_no):
+            raise self.errors[question_no].pop(0)
+
+class FloodBot(FakeBot):
+    """Bounce every send that arrives within `window` seconds of the first `trigger` send.
+
+    Each reply takes `rtt` seconds, so several sends are in flight when flood control hits.
+    """
+
+    def __init__(self, trigger, window=0.2, rtt=0.05):
+        super().__init__({})
+        self.trigger, self.window, self.rtt = trigger, window, rtt
+        self.flood_until = None
+        self.delivered = []
+
+    async def send_poll(self, chat_id, question, **kwargs):
+        now = asyncio.get_running_loop().time()
+        question_no = question.split(")", 1)[0]
+        self.attempts.append(question_no)
+        if question_no == self.trigger and self.flood_until is None:
+            self.flood_until = now + self.window
+        flooded = self.flood_until is not None and now < self.flood_until
+        if not flooded:
+            self.delivered.append(question_no)
+        await asyncio.sleep(self.rtt)
+        if flooded:
+            raise RetryAfter(0)
+
+class SendQuizBatchTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        csv_path = Path(tmp.name) / "quiz.csv"
+        with csv_path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["question_no", "question", "option1", "option2", "option3",
+                             "option4", "correct_answer", "description", "reference"])
+            for n in range(1, QUESTIONS + 1):
+                writer.writerow([n, f"Q{n}", "A", "B", "C", "D", "1", "", ""])
+
+        get_qbank.cache_clear()
+        self.addCleanup(get_qbank.cache_clear)
+        for name, value in {"CSV_PATH": csv_path, "PRIVATE_POLLS_PER_MINUTE": 6000}.items():
+            patcher = mock.patch.object(quiz_bot, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def send(self, errors):
+        bot = FakeBot(errors)
+        await self.run_batch(bot)
+        return bot.attempts
+
+    async def run_batch(self, bot):
+        # The shared limiter's lock belongs to whichever loop first used it
+        with mock.patch.object(quiz_bot, "BOT_RATE", quiz_bot.RateLimiter(1000)):
+            return await quiz_bot.send_quiz_batch(SimpleNamespace(bot=bot), 1)
+
+    async def test_sends_in_csv_order(self) -> None:
+        bot = FakeBot({})
+        self.assertEqual(await self.run_batch(bot), QUESTIONS)
+        self.assertEqual(bot.attempts, IN_ORDER)
+
+    async def test_flood_control_resends_before_later_questions(self) -> None:
+        attempts = await self.send({"2": [RetryAfter(0)]})
+        self.assertEqual(attempts, ["1", "2"] + IN_ORDER[1:])
+
+    async def test_flood_control_keeps_order_with_several_sends_in_flight(self) -> None:
+        bot = FloodBot("2")
+        await self.run_batch(bot)
+        self.assertGreater(len(bot.attempts), QUESTIONS)  # Flood control did bounce sends
+        self.assertEqual(bot.delivered, IN_ORDER)
+
+    async def test_network_error_retried_at_the_end(self) -> None:
+        attempts = await self.send({"3": [TimedOut()]})
+        self.assertEqual(attempts, IN_ORDER + ["3"])
+
+    async def test_rejected_poll_is_not_retried(self) -> None:
+        bot = FakeBot({"4": [BadRequest("Poll options must be non-empty")] * 2})
+        sent = await self.run_batch(bot)
+        self.assertEqual(bot.attempts, IN_ORDER)
+        self.assertEqual(sent, QUESTIONS - 1)
+
+if __name__ == "__main__":
+    unittest.main()